@@ -0,0 +1,458 @@
+import argparse
+import hashlib
+import io
+import json
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+# the processing and plotting functions that the app uses, without the Streamlit app itself
+import sq_functions as sq
+
+# pyarrow is optional, the tables are then only served as JSON
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+###############
+# the cache of the processed PROTEIN.tsv files
+# the keys are the SHA-256 hashes of the uploaded files, so that uploading the same file twice does not process it again
+
+cache = OrderedDict()
+
+cache_lock = threading.Lock()
+
+cache_size = 8
+
+# the same limit as the default upload limit of Streamlit
+max_upload = 200 * 1024 * 1024
+
+###############
+# defining a function
+
+def sq_upload(data):
+
+    """
+    This function processes an uploaded PROTEIN.tsv file with sq_processing() and stores the result in the cache.
+
+    Parameters
+    ----------
+    data : bytes
+        The content of the PROTEIN.tsv file.
+
+    Returns
+    -------
+    dictionary : dict
+        "id": the reference of the processed file in the cache.
+        "preflight": the output of sq_preflight().
+    """
+
+    file_id = hashlib.sha256(data).hexdigest()
+
+    with cache_lock:
+
+        if file_id in cache:
+
+            cache.move_to_end(file_id)
+
+            return {"id" : file_id, "preflight" : cache[file_id]["preflight"]}
+
+    file = io.BytesIO(data)
+
+    # the API does not report the projected processing time, therefore the pre-flight does not benchmark the file
+    preflight = sq.sq_preflight(file, benchmark = False)
+
+    if preflight["problems"]:
+
+        return {"id" : None, "preflight" : preflight}
+
+    dictionary = sq.sq_processing(pd.read_csv(file, sep = '\t'))
+
+    with cache_lock:
+
+        cache[file_id] = {"dictionary" : dictionary, "preflight" : preflight}
+
+        # the least recently used files are removed first
+        while len(cache) > cache_size:
+
+            cache.popitem(last = False)
+
+    return {"id" : file_id, "preflight" : preflight}
+
+
+###############
+# defining a function
+
+def sq_cached(file_id):
+
+    """
+    This function returns the collection of Pandas dataframes of a processed PROTEIN.tsv file from the cache.
+
+    Parameters
+    ----------
+    file_id : str
+        The reference that sq_upload() returned.
+
+    Returns
+    -------
+    dictionary : dict
+        The collection of Pandas dataframes, or None if the file is not in the cache (anymore).
+    """
+
+    with cache_lock:
+
+        if file_id not in cache:
+
+            return None
+
+        cache.move_to_end(file_id)
+
+        return cache[file_id]["dictionary"]
+
+
+###############
+# the request handler
+
+class SqHandler(BaseHTTPRequestHandler):
+
+    """
+    This class answers the requests of the HTTP API.
+
+    POST /upload
+        The body is the content of a PROTEIN.tsv file. Returns the reference (id) of the processed file and the treatment arms.
+    GET /summary/<id>?enrichment=2&statistical=2
+        Returns the output of sq_summary() as JSON.
+    GET /table/<id>/<arm>?format=json
+        Returns the table of one treatment arm as JSON records (format=json) or as an Arrow stream (format=arrow).
+    GET /figure/<id>/<arm>?enrichment=2&statistical=2&text=0&ligand=&project=&peptides=
+        Returns the volcano plot of one treatment arm as a Plotly JSON figure spec.
+    """
+
+    def send_json(self, status, content):
+
+        self.send_body(status, json.dumps(content).encode(), "application/json")
+
+    def send_body(self, status, body, content_type):
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def drain(self, length):
+
+        # the body of a refused request is read and discarded, otherwise closing the connection while the client is
+        # still sending resets it, and the client never sees the response
+        while length > 0:
+
+            chunk = self.rfile.read(min(length, 65536))
+
+            if not chunk:
+
+                break
+
+            length = length - len(chunk)
+
+    def respond(self, handle):
+
+        # errors in the uploaded data (e.g. a qValue of 0 that the pre-flight did not sample) are answered with 400,
+        # any other error with 500, so that the client always gets a response
+        try:
+            handle()
+        except ValueError as error:
+            self.send_json(400, {"error" : f"The request could not be processed ({error})."})
+        except Exception as error:
+            self.log_error("%s", repr(error))
+            self.send_json(500, {"error" : f"The request failed ({error})."})
+
+    def do_POST(self):
+
+        self.respond(self.handle_post)
+
+    def do_GET(self):
+
+        self.respond(self.handle_get)
+
+    def handle_post(self):
+
+        if urlparse(self.path).path != "/upload":
+
+            self.send_json(404, {"error" : f"Unknown path {self.path}."})
+
+            return
+
+        try:
+
+            length = int(self.headers.get("Content-Length", 0))
+
+        except ValueError:
+
+            self.send_json(400, {"error" : "The Content-Length header needs to be a number."})
+
+            return
+
+        if length == 0:
+
+            self.send_json(400, {"error" : "The body needs to contain a PROTEIN.tsv file."})
+
+            return
+
+        if length > max_upload:
+
+            self.drain(length)
+
+            self.send_json(413, {"error" : f"The file is larger than {max_upload} bytes."})
+
+            return
+
+        upload = sq_upload(self.rfile.read(length))
+
+        preflight = upload["preflight"]
+
+        if upload["id"] is None:
+
+            self.send_json(400, {"problems" : preflight["problems"]})
+
+            return
+
+        self.send_json(200, {"id" : upload["id"], "arms" : preflight["arms"], "rows" : preflight["rows"]})
+
+    def handle_get(self):
+
+        url = urlparse(self.path)
+
+        query = {name : values[0] for name, values in parse_qs(url.query).items()}
+
+        # the path is e.g. /figure/<id>/<arm>
+        match = re.search(r"^/(summary|table|figure)/([0-9a-f]+)(/([^/]+))?$", url.path)
+
+        if match is None:
+
+            self.send_json(404, {"error" : f"Unknown path {url.path}."})
+
+            return
+
+        endpoint, file_id, arm = match.group(1), match.group(2), match.group(4)
+
+        dictionary = sq_cached(file_id)
+
+        if dictionary is None:
+
+            self.send_json(404, {"error" : f"The file {file_id} is not in the cache, please upload it again."})
+
+            return
+
+        if endpoint != "summary" and arm not in dictionary:
+
+            self.send_json(404, {"error" : f"Unknown treatment arm {arm}, the treatment arms are: {', '.join(dictionary)}."})
+
+            return
+
+        try:
+
+            enrichment_threshold = float(query.get("enrichment", 2.0))
+
+            statistical_threshold = float(query.get("statistical", 2.0))
+
+        except ValueError:
+
+            self.send_json(400, {"error" : "The enrichment and statistical thresholds need to be numbers."})
+
+            return
+
+        ##################################################
+        # the summary of all treatment arms
+
+        if endpoint == "summary":
+
+            summary = sq.sq_summary(dictionary, enrichment_threshold, statistical_threshold)
+
+            self.send_json(200, {"overview" : json.loads(summary["overview"].to_json(orient = "index")),
+                                 "top" : json.loads(summary["top"].to_json(orient = "records"))
+                                })
+
+        ##################################################
+        # the table of one treatment arm
+
+        elif endpoint == "table":
+
+            table_format = query.get("format", "json")
+
+            if table_format == "json":
+
+                self.send_body(200, dictionary[arm].to_json(orient = "records").encode(), "application/json")
+
+            elif table_format == "arrow" and pa is not None:
+
+                table = pa.Table.from_pandas(dictionary[arm], preserve_index = False)
+
+                sink = pa.BufferOutputStream()
+
+                with pa.ipc.new_stream(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+                self.send_body(200, sink.getvalue().to_pybytes(), "application/vnd.apache.arrow.stream")
+
+            elif table_format == "arrow":
+
+                self.send_json(406, {"error" : "The arrow format needs pyarrow to be installed."})
+
+            else:
+
+                self.send_json(400, {"error" : f"Unknown format {table_format}, the formats are: json, arrow."})
+
+        ##################################################
+        # the volcano plot of one treatment arm
+
+        else:
+
+            summary = sq.sq_summary({arm : dictionary[arm]}, enrichment_threshold, statistical_threshold)
+
+            title = f"{query.get('ligand', '')} vs {arm} ({query.get('project', '')}, {query.get('peptides', '')})"
+
+            fig = sq.sq_figure(dictionary[arm],
+                               title,
+                               enrichment_threshold,
+                               statistical_threshold,
+                               int(summary["overview"].loc[arm, "log2 range"]),
+                               int(summary["overview"].loc[arm, "-log10 range"]),
+                               text = query.get("text", "0") == "1")
+
+            self.send_body(200, fig.to_json().encode(), "application/json")
+
+
+###############
+# the request handler for refused requests
+
+class SqBusyHandler(SqHandler):
+
+    """
+    This class answers every request with 503, after reading its headers and its body, while the queue of SqServer is full.
+    """
+
+    def refuse(self):
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = 0
+
+        self.drain(min(length, max_upload))
+
+        body = json.dumps({"error" : "The server is busy, please try again later."}).encode()
+
+        self.send_response(503)
+        self.send_header("Retry-After", "1")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+
+        self.refuse()
+
+    def do_POST(self):
+
+        self.refuse()
+
+
+###############
+# the server
+
+class SqServer(HTTPServer):
+
+    """
+    This class serves the HTTP API with a bounded pool of worker threads.
+    Requests wait in a queue while all workers are busy, and are refused with 503 if the queue is full as well.
+
+    Parameters
+    ----------
+    address : tuple
+        The host and port, e.g. ("127.0.0.1", 8502).
+    workers : int
+        The number of worker threads.
+    queue : int
+        The number of requests that can wait for a worker thread.
+    """
+
+    def __init__(self, address, workers = 4, queue = 16):
+
+        super().__init__(address, SqHandler)
+
+        self.executor = ThreadPoolExecutor(max_workers = workers)
+
+        # the refused requests are answered by their own threads, so that reading their bodies does not block
+        # the server from accepting new requests, nor the worker threads from processing the queued ones
+        self.executor_busy = ThreadPoolExecutor(max_workers = workers)
+
+        # one slot for each running or waiting request
+        self.slots = threading.BoundedSemaphore(workers + queue)
+
+    def process_request(self, request, client_address):
+
+        if not self.slots.acquire(blocking = False):
+
+            self.executor_busy.submit(self.refuse_request, request, client_address)
+
+            return
+
+        self.executor.submit(self.process_request_worker, request, client_address)
+
+    def process_request_worker(self, request, client_address):
+
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+    def refuse_request(self, request, client_address):
+
+        try:
+            SqBusyHandler(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+
+        super().server_close()
+
+        self.executor.shutdown(wait = True)
+
+        self.executor_busy.shutdown(wait = True)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description = "Serve the processed SafeQuant tables and volcano plots over HTTP.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "The host to listen on (default: 127.0.0.1, i.e. only local requests).")
+    parser.add_argument("--port", type = int, default = 8502, help = "The port to listen on (default: 8502).")
+    parser.add_argument("--workers", type = int, default = 4, help = "The number of worker threads (default: 4).")
+    parser.add_argument("--queue", type = int, default = 16, help = "The number of requests that can wait for a worker thread (default: 16).")
+    parser.add_argument("--cache", type = int, default = 8, help = "The number of processed files that are kept in memory (default: 8).")
+    args = parser.parse_args()
+
+    cache_size = args.cache
+
+    server = SqServer((args.host, args.port), args.workers, args.queue)
+
+    print(f"Serving the SafeQuant API on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,681 @@
+import pandas as pd
+import plotly.express as px
+import numpy as np
+import re
+import math
+import io
+import time
+
+###############
+# defining a function
+
+def sq_processing(sq_df):
+
+    """
+    This function processes the PROTEIN.tsv file that SafeQuant serves as output and returns a dictionary whose values are Pandas dataframes.
+
+    Parameters
+    ----------
+    Safequant output (PROTEIN.tsv)
+        The tsv file that SafeQuant returns with the protein data.
+    
+    Returns
+    -------
+    dictionary : dict
+        The collection of Pandas dataframes.
+    """
+
+    df = sq_df.copy()
+    
+    # creating the list of column names
+    # creating the list of column names to keep
+    # creating the list of column names to drop
+    
+    # the * operator unpacks the .columns set, the list() method would also work 
+    column_names = [*df.columns]
+    
+    # Match objects always have a boolean value of True. re.search() returns Match objects if it finds a match
+    columns_to_keep = [name for name in column_names if re.search( r"(proteinName)|(^ac)|(geneName)|(proteinDescription)|(nbPeptides)|(^pValue)|(^qValue)|(^log2ratio)", name)]
+    
+    # the columns_to_drop list gets processed and complete with the for loop below
+    columns_to_drop = column_names.copy()
+    
+    for column in columns_to_keep:
+    
+        columns_to_drop.remove(column)
+
+    # dropping the unnecessary columns
+
+    df.drop(labels = columns_to_drop, axis = 1, inplace = True)
+
+    # renaming columns
+
+    df.rename(columns = {"proteinName" : "Protein Name",
+                              "ac" : "Accession",
+                              "geneName" : "Gene Name",
+                              "proteinDescription" : "Protein Description"
+                             }, inplace = True)
+
+    # shortening the info in the "Protein Description" column
+
+    df["Protein Description"] = df["Protein Description"].apply(lambda x: re.sub(r"\sOS=.+$", "", x))
+    
+    # removing additional accessions from the "Protein Name" column
+    
+    df["Protein Name"] = df["Protein Name"].apply(lambda x: re.sub(r";.+$", "", x))
+    
+    # creating a new column with a shortened "Protein Name" and making it the second column of the data frame
+    # ATTENTION: this will disguise ligands coming from another species!!!
+    
+    df["Protein Name (short)"] = df["Protein Name"].apply(lambda x: re.sub(r"(^sp\|.+\|)|(_.+$)", "", x))
+    
+    column_to_move = df.pop("Protein Name (short)")
+    
+    df.insert(1, "Protein Name (short)", column_to_move)
+
+    # selecting the columns that will be logarithmized
+
+    # Match objects always have a boolean value of True. re.search() returns Match objects if it finds a match
+    columns_for_log = [name for name in columns_to_keep if re.search( r"(^qValue)", name)]
+    
+    # logarithmizing the qValues
+    for name in columns_for_log:
+        
+        df[f"-log10({name})"] = df[f"{name}"].apply(lambda x: abs(math.log10(x)))
+
+    # selecting columns whose names end with all possible ligands, e.g. the log2 columns
+    # the columns_for_log list from above can also be used instead
+
+    columns_ligand = [name for name in df.columns if re.search(r"^log2", name)]
+
+    # finding out what are the names of the treatment arms
+    # IMPORTANT: the name of the treatment arm must not contain "_" and always be in the format e.g. log2ratio_NAME
+    
+    treatment_arms =[]
+    
+    for name in columns_ligand:
+    
+        # this returns the match object for each treatment arm
+        match = re.search(r"_.+$", name)
+    
+        # this returns the matching string for each treatment arm after stripping the "_"
+        treatment_arms.append(match.group().lstrip("_"))
+
+    # these columns need always be present
+    columns_obligatory = [*df.iloc[:, 0:6].columns]
+    
+    # this placeholder dictionary will store each ligand's dataframe
+    df_collection = {}
+    
+    for arm in treatment_arms:
+    
+        # create a dataframe for each treatment arm with the columns to be kept in each iteration, i.e. obligatory columns, plus ligand-specific columns
+        # Match objects always have a boolean value of True. re.search() returns Match objects if it finds a match
+        columns_to_include = [name for name in df.columns if name in columns_obligatory or re.search(fr"_{arm}\)?$", name)]
+        
+        df_interim = df.loc[:, columns_to_include].copy()
+        
+        df_collection[f"{arm}"] = df_interim.copy()
+    
+        ################
+        # export the dataframes as tsv files
+        # renaming the -log10(qValue) column before exporting for compatibility with Excel
+    
+        #df_interim.rename(columns = {f"-log10(qValue_{arm})" : f"'-log10(qValue_{arm})"}, inplace = True)
+    
+        #df_interim.to_csv(f'{ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', sep = '\t', index=False)
+        
+        ################
+        
+    # this dictionary contains the final tables for each ligand/treatment arm 
+    return df_collection
+
+
+###############
+# defining a function
+
+def sq_preflight(file, sample_rows = 20, benchmark = True):
+
+    """
+    This function checks a PROTEIN.tsv file before it is fully parsed, by reading only the header line and a few sample rows.
+    It looks for the columns that sq_processing() needs, detects the treatment arms and estimates the size of the whole file.
+
+    Parameters
+    ----------
+    file : file-like object
+        The uploaded PROTEIN.tsv file (opened in binary mode). The position is reset to the start of the file afterwards.
+    sample_rows : int
+        The number of rows that are read after the header line.
+    benchmark : bool
+        Whether the processing time is projected. This parses and processes the sample rows twice.
+    
+    Returns
+    -------
+    dictionary : dict
+        "arms": list with the names of the treatment arms.
+        "rows": estimated number of rows of the whole file.
+        "memory": estimated memory (in bytes) of the whole file as a Pandas dataframe.
+        "seconds": projected time (in seconds) to parse the whole file and process it with sq_processing(), without the plots (0.0 without benchmark).
+        "problems": list with the problems that were found. The file can only be processed if the list is empty.
+    """
+
+    preflight = {"arms" : [], "rows" : 0, "memory" : 0, "seconds" : 0.0, "problems" : []}
+
+    problems = preflight["problems"]
+
+    ##################################################
+    # reading only the header line and the sample rows
+
+    file.seek(0, 2)
+
+    file_size = file.tell()
+
+    file.seek(0)
+
+    lines = [file.readline() for _ in range(sample_rows + 1)]
+
+    file.seek(0)
+
+    try:
+
+        sample_df = pd.read_csv(io.BytesIO(b"".join(lines)), sep = '\t')
+
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as error:
+
+        problems.append(f"The file could not be read as a tab-separated file ({error}).")
+
+        return preflight
+
+    ##################################################
+    # checking the columns that sq_processing() needs
+
+    column_names = [*sample_df.columns]
+
+    # these columns need always be present and they need to be the first ones that sq_processing() keeps
+    columns_obligatory = ["proteinName", "ac", "geneName", "proteinDescription", "nbPeptides"]
+
+    columns_missing = [name for name in columns_obligatory if name not in column_names]
+
+    if columns_missing:
+
+        problems.append(f"The following SafeQuant columns are missing: {', '.join(columns_missing)}.")
+
+    # the same selection as in sq_processing()
+    columns_to_keep = [name for name in column_names if re.search( r"(proteinName)|(^ac)|(geneName)|(proteinDescription)|(nbPeptides)|(^pValue)|(^qValue)|(^log2ratio)", name)]
+
+    if not columns_missing and columns_to_keep[0:5] != columns_obligatory:
+
+        problems.append(f"The SafeQuant columns are not in the expected order: {', '.join(columns_obligatory)}.")
+
+    ##################################################
+    # detecting the treatment arms, e.g. log2ratio_NAME
+
+    columns_ligand = [name for name in column_names if re.search(r"^log2", name)]
+
+    if not columns_ligand:
+
+        problems.append("No log2ratio columns were found, therefore no treatment arms can be detected.")
+
+    for name in columns_ligand:
+
+        match = re.search(r"^log2ratio_(.+)$", name)
+
+        if match is None:
+
+            problems.append(f"The column {name} is not in the format log2ratio_NAME.")
+
+            continue
+
+        arm = match.group(1)
+
+        preflight["arms"].append(arm)
+
+        # IMPORTANT: the name of the treatment arm must not contain "_"
+        if "_" in arm:
+
+            problems.append(f"The name of the treatment arm {arm} contains an underscore, which is not supported.")
+
+        # each treatment arm needs its log2ratio, pValue and qValue columns in this order
+        columns_arm = [f"log2ratio_{arm}", f"pValue_{arm}", f"qValue_{arm}"]
+
+        if any(column not in column_names for column in columns_arm):
+
+            problems.append(f"The treatment arm {arm} needs the columns {', '.join(columns_arm)}.")
+
+        elif [column for column in columns_to_keep if column in columns_arm] != columns_arm:
+
+            problems.append(f"The columns of the treatment arm {arm} are not in the order {', '.join(columns_arm)}.")
+
+        # the qValues get logarithmized, therefore they need to be numbers above 0
+        elif not pd.api.types.is_numeric_dtype(sample_df[f"qValue_{arm}"]) or (sample_df[f"qValue_{arm}"] <= 0).any():
+
+            problems.append(f"The column qValue_{arm} does not contain numbers above 0.")
+
+    ##################################################
+    # estimating the size of the whole file from the sample rows
+
+    sample_size = sum(len(line) for line in lines[1:])
+
+    if len(sample_df) > 0 and sample_size > 0:
+
+        preflight["rows"] = round((file_size - len(lines[0])) / (sample_size / len(sample_df)))
+
+        preflight["memory"] = round(sample_df.memory_usage(deep = True).sum() / len(sample_df) * preflight["rows"])
+
+    else:
+
+        problems.append("The file does not contain any protein rows.")
+
+    ##################################################
+    # projecting the time to parse the whole file and process it with sq_processing(), the plots are not included
+    # the sample rows and 50 copies of them are parsed and processed, and the difference between both timings
+    # separates the cost per row from the fixed cost
+
+    if benchmark and not problems:
+
+        sample_rows_bytes = b"".join(lines[1:])
+
+        if not sample_rows_bytes.endswith(b"\n"):
+
+            sample_rows_bytes = sample_rows_bytes + b"\n"
+
+        timings = []
+
+        for copies in (1, 50):
+
+            start = time.perf_counter()
+
+            sq_processing(pd.read_csv(io.BytesIO(lines[0] + sample_rows_bytes * copies), sep = '\t'))
+
+            timings.append(time.perf_counter() - start)
+
+        seconds_per_row = max(timings[1] - timings[0], 0) / (49 * len(sample_df))
+
+        preflight["seconds"] = timings[0] + seconds_per_row * max(preflight["rows"] - len(sample_df), 0)
+
+    return preflight
+
+
+###############
+# defining a function
+
+def sq_summary(dictionary, enrichment_threshold, statistical_threshold, top_n = 10):
+
+    """
+    This function summarizes all treatment arms of a dictionary whose values are Pandas dataframes containing data from SafeQuant.
+    The log2ratio and -log10(qValue) columns of all treatment arms are stacked into two proteins x arms NumPy arrays,
+    so that the axis ranges, the hit counts and the top hits of every treatment arm are computed in a single pass.
+
+    Parameters
+    ----------
+    dictionary : dict
+        The collection of Pandas dataframes.
+    enrichment_threshold : float
+        The enrichment threshold (log2 space).
+    statistical_threshold : float
+        The statistical threshold (-log10 space).
+    top_n : int
+        The number of top hits (sorted by -log10(qValue)) reported for each treatment arm.
+    
+    Returns
+    -------
+    dictionary : dict
+        "overview": Pandas dataframe with the axis ranges and the number of up/down hits of each treatment arm.
+        "hits": Pandas dataframe (proteins x arms) with 1 for up, -1 for down and 0 for no hit, only for proteins with at least one hit.
+        "top": Pandas dataframe with the top hits of each treatment arm.
+        "score": Pandas series with the highest -log10(qValue) of each protein of "hits", only counting the treatment arms where it is a hit.
+    """
+
+    treatment_arms = [*dictionary]
+
+    # all dataframes of the dictionary share the same rows, therefore the first one provides the protein names
+    df_first = dictionary[treatment_arms[0]]
+
+    protein_names = df_first.iloc[:, 0].to_numpy()
+
+    # stacking the log2ratio (7th) and -log10(qValue) (10th) columns of all treatment arms into proteins x arms arrays
+    log2_matrix = np.column_stack([dictionary[arm].iloc[:, 6].to_numpy(dtype = float) for arm in treatment_arms])
+
+    log10_matrix = np.column_stack([dictionary[arm].iloc[:, 9].to_numpy(dtype = float) for arm in treatment_arms])
+
+    ##################################################
+    # determine the range of the x axis based on the log2 columns
+    # the range is the largest absolute log2ratio plus 1, rounded up to the next even number
+    
+    # fmax/fmin skip NaN values and return NaN (without a warning) only for arms without any value
+    log2extreme = np.fmax(np.fmax.reduce(log2_matrix, axis = 0), np.abs(np.fmin.reduce(log2_matrix, axis = 0)))
+
+    # arms without any log2ratio get the smallest range instead of a NaN that cannot be converted to an integer
+    log2extreme = np.where(np.isnan(log2extreme), 0, log2extreme)
+
+    log2range = np.ceil(log2extreme + 1).astype(int)
+
+    log2range = log2range + log2range % 2
+
+    ##################################################
+    # determine the range of the y axis based on the -log10 columns
+
+    log10max = np.fmax.reduce(log10_matrix, axis = 0)
+
+    # arms without any qValue get the smallest range as well
+    log10max = np.where(np.isnan(log10max), 0, log10max)
+
+    log10range = np.ceil(log10max + 2).astype(int)
+
+    ##################################################
+    # counting the hits, i.e. the proteins outside of the shaded areas of the volcano plots
+    # comparisons with NaN values are always False, therefore proteins with missing values are never hits
+
+    significant = (np.abs(log2_matrix) >= enrichment_threshold) & (log10_matrix >= statistical_threshold)
+
+    up = significant & (log2_matrix > 0)
+
+    down = significant & (log2_matrix < 0)
+
+    overview = pd.DataFrame({"log2 range" : log2range,
+                             "-log10 range" : log10range,
+                             "up" : up.sum(axis = 0),
+                             "down" : down.sum(axis = 0)
+                            }, index = treatment_arms)
+
+    ##################################################
+    # the hit matrix only keeps proteins that are hits in at least one treatment arm
+
+    proteins_with_hits = significant.any(axis = 1)
+
+    hits = pd.DataFrame(up[proteins_with_hits].astype(int) - down[proteins_with_hits].astype(int),
+                        index = df_first.index[proteins_with_hits],
+                        columns = treatment_arms)
+
+    hits.insert(0, "Protein Name", protein_names[proteins_with_hits])
+
+    ##################################################
+    # sorting the proteins of each treatment arm by -log10(qValue), non-hits are pushed to the end
+
+    score = np.where(significant, log10_matrix, -np.inf)
+
+    # the best score of each protein with hits is also used to rank the proteins in sq_intensity()
+    hits_score = pd.Series(score[proteins_with_hits].max(axis = 1), index = hits.index)
+
+    order = np.argsort(-score, axis = 0, kind = "stable")[:top_n]
+
+    # the transposed array returns the positions grouped by treatment arm and then by rank
+    arm_position, rank = np.nonzero(np.take_along_axis(significant, order, axis = 0).T)
+
+    protein_position = order[rank, arm_position]
+
+    top = pd.DataFrame({"Treatment arm" : np.array(treatment_arms)[arm_position],
+                        "Rank" : rank + 1,
+                        "Protein Name" : protein_names[protein_position],
+                        "log2ratio" : log2_matrix[protein_position, arm_position],
+                        "-log10(qValue)" : log10_matrix[protein_position, arm_position]
+                       })
+
+    return {"overview" : overview, "hits" : hits, "top" : top, "score" : hits_score}
+
+
+###############
+# defining a function
+
+def sq_order(matrix):
+
+    """
+    This function returns an ordering of the rows of a NumPy array that places similar rows next to each other.
+    The ordering is a greedy nearest neighbour chain on the euclidean distances between the rows,
+    which is fast enough for a few thousand rows and does not need any clustering library.
+
+    Parameters
+    ----------
+    matrix : numpy.ndarray
+        The 2-D array whose rows are ordered. NaN values are treated as 0.
+    
+    Returns
+    -------
+    order : numpy.ndarray
+        The positions of the rows in their new order.
+    """
+
+    values = np.nan_to_num(matrix)
+
+    # an empty array has nothing to order
+    if len(values) == 0:
+
+        return np.array([], dtype = int)
+
+    # all pairwise squared euclidean distances are computed at once
+    squared_norms = (values ** 2).sum(axis = 1)
+
+    distances = squared_norms[:, None] + squared_norms[None, :] - 2 * values @ values.T
+
+    # the chain starts with the row that lies furthest away from the origin, i.e. one of the extremes
+    order = [int(np.argmax(squared_norms))]
+
+    visited = np.zeros(len(values), dtype = bool)
+
+    visited[order[0]] = True
+
+    for _ in range(len(values) - 1):
+
+        # the next row is the closest row that has not been visited yet
+        candidates = np.where(visited, np.inf, distances[order[-1]])
+
+        position = int(np.argmin(candidates))
+
+        order.append(position)
+
+        visited[position] = True
+
+    return np.array(order, dtype = int)
+
+
+###############
+# defining a function
+
+def sq_intensity(sq_df, summary, max_proteins = 200):
+
+    """
+    This function collects the replicate intensities from the PROTEIN.tsv file for the proteins that pass the thresholds in at least one treatment arm.
+    The intensities are z-scored per protein (log2 space), and both the proteins and the replicates are ordered with sq_order().
+
+    Parameters
+    ----------
+    Safequant output (PROTEIN.tsv)
+        The tsv file that SafeQuant returns with the protein data.
+    summary : dict
+        The output of sq_summary().
+    max_proteins : int
+        The maximum number of proteins. If there are more hits, the ones with the highest score of sq_summary() are kept,
+        i.e. the lowest qValue in a treatment arm where the protein is a hit.
+    
+    Returns
+    -------
+    dictionary : dict
+        "zscore": Pandas dataframe (proteins x replicates) with the z-scored intensities.
+        "stats": Pandas dataframe with the medianInt and cv columns of the same proteins.
+    """
+
+    hits = summary["hits"]
+
+    column_names = [*sq_df.columns]
+
+    columns_stats = [name for name in column_names if re.search(r"(^medianInt_)|(^cv_)", name)]
+
+    # SafeQuant writes the replicate intensities between the allAccessions column and the first medianInt column
+    # only the numeric columns of this block are used, so that additional text columns are never z-scored
+    columns_replicate = []
+
+    if "allAccessions" in column_names and columns_stats and re.search(r"^medianInt_", columns_stats[0]):
+
+        columns_between = column_names[column_names.index("allAccessions") + 1 : column_names.index(columns_stats[0])]
+
+        columns_replicate = [name for name in columns_between if pd.api.types.is_numeric_dtype(sq_df[name])]
+
+    # without hits or replicate intensities there is nothing to z-score, the empty dataframes are handled by sq_plot_intensity()
+    if hits.empty or not columns_replicate:
+
+        stats_df = sq_df.loc[[], columns_stats].copy()
+
+        stats_df.insert(0, "Protein Name", [])
+
+        return {"zscore" : pd.DataFrame(columns = columns_replicate), "stats" : stats_df}
+
+    ##################################################
+    # capping the number of proteins at max_proteins, keeping the ones with the highest score of sq_summary()
+    
+    rows = hits.index
+
+    if len(rows) > max_proteins:
+
+        rows = rows[np.argsort(-summary["score"].loc[rows].to_numpy(), kind = "stable")[:max_proteins]]
+
+    ##################################################
+    # z-scoring the log2 intensities per protein, intensities of 0 are treated as missing values
+    
+    intensities = sq_df.loc[rows, columns_replicate].to_numpy(dtype = float)
+
+    log2_intensities = np.log2(np.where(intensities > 0, intensities, np.nan))
+
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+
+        zscores = (log2_intensities - np.nanmean(log2_intensities, axis = 1, keepdims = True)) / np.nanstd(log2_intensities, axis = 1, keepdims = True)
+
+    ##################################################
+    # ordering the proteins (rows) and the replicates (columns) so that similar profiles lie next to each other
+    
+    row_order = sq_order(zscores)
+
+    column_order = sq_order(zscores.T)
+
+    protein_names = hits.loc[rows, "Protein Name"].to_numpy()[row_order]
+
+    zscore_df = pd.DataFrame(zscores[row_order][:, column_order],
+                             index = protein_names,
+                             columns = np.array(columns_replicate)[column_order])
+
+    stats_df = sq_df.loc[rows[row_order], columns_stats].copy()
+
+    stats_df.insert(0, "Protein Name", protein_names)
+
+    return {"zscore" : zscore_df, "stats" : stats_df}
+
+
+###############
+# defining a function
+
+def sq_figure(df, title, enrichment_threshold, statistical_threshold, log2range, log10range, text = False):
+
+    """
+    This function creates the volcano plot of one treatment arm, i.e. of one Pandas dataframe containing data from SafeQuant.
+    It does not depend on Streamlit, so that the volcano plots can also be created outside of the app.
+
+    Parameters
+    ----------
+    df : Pandas dataframe
+        The dataframe of one treatment arm.
+    title : str
+        The title of the volcano plot.
+    enrichment_threshold : float
+        The enrichment threshold (log2 space).
+    statistical_threshold : float
+        The statistical threshold (-log10 space).
+    log2range : int
+        The range of the x axis (see sq_summary()).
+    log10range : int
+        The range of the y axis (see sq_summary()).
+    text : bool
+        Whether the short protein names are shown as text annotations.
+    
+    Returns
+    -------
+    Plotly Plot
+        The plot created by Plotly.
+    """
+
+    ##################################################
+    # using plotly to draw the volcano plot
+    
+    fig = px.scatter(df,
+                     x = df.iloc[: , 6],
+                     y = df.iloc[: , 9], 
+                     hover_name = df.iloc[: , 0],
+                     hover_data = [df.iloc[: , 5], df.iloc[: , 6], df.iloc[: , 9]],
+                     labels = {df.iloc[: , 6].name : "log\u2082(fold change)", df.iloc[: , 9].name : "-log\u2081\u2080(adjusted p-value)"},
+                     text = df.iloc[: , 1] if text else None
+                    )
+
+    fig.update_traces(textposition='top center')
+
+    fig.update_traces(marker={"size" : 6,
+                              "line": {"width" : 1, "color" : "black"},
+                              "color" : "teal"
+                             }
+                     )
+
+    # setting background properties
+    fig.update_layout(plot_bgcolor = "white")
+
+    # setting title properties
+    fig.update_layout(title_text = title)
+    fig.update_layout(title = {'x' : 0.5, 'y' : 0.96,'xanchor' : 'center', 'yanchor' : 'top'})        
+    fig.update_xaxes(title_font = {"size": 16},  title_standoff = 10)
+    fig.update_yaxes(title_font = {"size": 16},  title_standoff = 10)
+
+    # setting axes range and tick properties
+    fig.update_xaxes(range = [-log2range, log2range], fixedrange = False, dtick = 2, ticklabelstandoff = 7)
+    fig.update_yaxes(range = [0, log10range], fixedrange = False, dtick = 1, ticklabelstandoff = 7)
+    fig.update_yaxes(ticklabelstep=1)
+
+    # setting axes line properties
+    fig.update_xaxes(showline=True, linewidth=1, linecolor='black', mirror = True)
+    fig.update_yaxes(showline=True, linewidth=1, linecolor='black', mirror = True)
+
+    # setting zero line properties
+    fig.update_xaxes(zeroline=True, zerolinewidth=2, zerolinecolor='black')
+    fig.update_yaxes(zeroline=False, zerolinewidth=3, zerolinecolor='black')
+
+    # setting grid properties (Plotly accepts hex colours as strings)
+    fig.update_yaxes(showgrid = True, gridcolor = '#bbbbbf', gridwidth = 1)
+    fig.update_xaxes(showgrid = True, gridcolor = '#bbbbbf', gridwidth = 1)
+
+    # adding background shapes
+    fig.add_shape(type = "rect",
+                  x0 = enrichment_threshold, 
+                  y0 = 0, 
+                  x1 = log2range, 
+                  y1 = statistical_threshold,
+                  line = {"color" : "blue", "width" : 0},
+                  fillcolor = "blue",
+                  opacity = 0.1
+                 )
+
+    fig.add_shape(type="rect",
+                  x0 = 0, 
+                  y0 = 0, 
+                  x1 = enrichment_threshold, 
+                  y1 = log10range,
+                  line = {"color" : "blue", "width" : 0},
+                  fillcolor = "blue",
+                  opacity=0.1
+                 )
+
+    fig.add_shape(type="rect",
+                  x0 = -enrichment_threshold, 
+                  y0 = 0, 
+                  x1 = -log2range, 
+                  y1 = statistical_threshold,
+                  line = {"color" : "blue", "width" : 0},
+                  fillcolor="blue",
+                  opacity=0.1
+                 )
+
+    fig.add_shape(type="rect",
+                  x0 = 0, 
+                  y0 = 0, 
+                  x1 = -enrichment_threshold, 
+                  y1 = log10range,
+                  line = {"color" : "blue", "width" : 0},
+                  fillcolor="blue",
+                  opacity=0.1
+                 )
+
+    return fig
@@ -0,0 +1,332 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+###############
+# defining a function
+
+def sq_scale_file(data, scale):
+
+    """
+    This function enlarges a PROTEIN.tsv file by repeating its protein rows, so that the load test can be run with larger files.
+
+    Parameters
+    ----------
+    data : bytes
+        The content of the PROTEIN.tsv file.
+    scale : int
+        How many times the protein rows are repeated.
+
+    Returns
+    -------
+    data : bytes
+        The content of the enlarged PROTEIN.tsv file.
+    """
+
+    header, _, rows = data.partition(b"\n")
+
+    if not rows.endswith(b"\n"):
+
+        rows = rows + b"\n"
+
+    return header + b"\n" + rows * scale
+
+
+###############
+# defining a function
+
+def sq_memory():
+
+    """
+    This function returns the current memory (resident set size) of the process in MB.
+
+    Returns
+    -------
+    float
+        The current memory in MB, or None if it cannot be measured on this platform (it is only available on Linux).
+    """
+
+    if not os.path.exists("/proc/self/statm"):
+
+        return None
+
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+###############
+# defining a function
+
+def sq_session(app_path, data, session, moves, intensity, timeout, latencies, errors):
+
+    """
+    This function scripts one user session of the app: it enters the project details, uploads the PROTEIN.tsv file and moves the sliders.
+    The step and the duration of every rerun of the app are appended to the latencies list.
+
+    Parameters
+    ----------
+    app_path : str
+        The path of the Streamlit app (sq_streamlit.py).
+    data : bytes
+        The content of the PROTEIN.tsv file.
+    session : int
+        The number of the session, which is used for the project and ligand names. The app names its tsv files after the ligand
+        and its html files after the project and the ligand, so that the sessions do not overwrite each other's files.
+    moves : int
+        The number of times that the sliders are moved.
+    intensity : bool
+        Whether the replicate intensity heatmap is switched on before the sliders are moved.
+    timeout : float
+        The time in seconds after which a rerun is aborted.
+    latencies : list
+        The placeholder list for the steps and the durations of the reruns (in seconds), e.g. ("upload", 1.2).
+    errors : list
+        The placeholder list for the exceptions of the app and of the session itself.
+    """
+
+    at = AppTest.from_file(app_path, default_timeout = timeout)
+
+    def rerun(step):
+
+        start = time.perf_counter()
+
+        at.run()
+
+        duration = time.perf_counter() - start
+
+        # a script that cannot be compiled does not raise an exception in the app, it just renders nothing
+        if not at.main.children:
+
+            raise RuntimeError("The app did not render any elements (e.g. the script could not be compiled).")
+
+        if at.exception:
+
+            raise RuntimeError("; ".join(exception.message for exception in at.exception))
+
+        latencies.append((step, duration))
+
+    # a failing session stops at its first error, which is counted instead of stopping the thread silently
+    try:
+        sq_session_steps(at, rerun, data, session, moves, intensity)
+    except Exception as error:
+        errors.append(repr(error))
+
+
+###############
+# defining a function
+
+def sq_session_steps(at, rerun, data, session, moves, intensity):
+
+    """
+    This function contains the steps of one user session of the app (see sq_session()).
+
+    Parameters
+    ----------
+    at : AppTest
+        The simulated app of the session.
+    rerun : function
+        The function that reruns the app and measures the rerun, it takes the name of the step.
+    data : bytes
+        The content of the PROTEIN.tsv file.
+    session : int
+        The number of the session.
+    moves : int
+        The number of times that the sliders are moved.
+    intensity : bool
+        Whether the replicate intensity heatmap is switched on before the sliders are moved.
+    """
+
+    # opening the app
+    rerun("open")
+
+    # entering the project details
+    at.text_input(key = "project_info_key").input(f"LOAD{session}")
+    at.text_input(key = "ligand_on_the_left_key").input(f"IL38-{session}")
+    at.text_input(key = "number_of_peptides_key").input("2pep")
+    rerun("details")
+
+    # uploading the PROTEIN.tsv file
+    at.file_uploader[0].upload("PROTEIN.tsv", data, "text/tab-separated-values")
+    rerun("upload")
+
+    if intensity:
+
+        at.checkbox(key = "show_intensity_key").check()
+        rerun("intensity")
+
+    # moving the enrichment and statistical threshold sliders back and forth
+    for move in range(moves):
+
+        at.slider[0].set_value([1.0, 1.5, 2.0, 2.5][move % 4])
+        at.slider[1].set_value([1.0, 1.5, 2.0, 2.5][(move + 1) % 4])
+        rerun("slider")
+
+
+###############
+# defining a function
+
+def sq_loadtest(app_path, data, sessions, scale, moves = 4, intensity = False, timeout = 120):
+
+    """
+    This function runs concurrent user sessions of the app (one thread each, like the Streamlit server) and measures the reruns.
+
+    Parameters
+    ----------
+    app_path : str
+        The path of the Streamlit app (sq_streamlit.py).
+    data : bytes
+        The content of the PROTEIN.tsv file.
+    sessions : int
+        The number of concurrent sessions.
+    scale : int
+        How many times the protein rows of the PROTEIN.tsv file are repeated.
+    moves : int
+        The number of times that each session moves the sliders.
+    intensity : bool
+        Whether the replicate intensity heatmap is switched on.
+    timeout : float
+        The time in seconds after which a rerun is aborted.
+
+    Returns
+    -------
+    dictionary : dict
+        The latency percentiles (in seconds) of the successful upload reruns and of the successful slider reruns, the throughput
+        (successful reruns per second), the memory of the process before the sessions and its largest growth during the sessions (in MB).
+    """
+
+    data_scaled = sq_scale_file(data, scale)
+
+    latencies = []
+
+    errors = []
+
+    threads = [threading.Thread(target = sq_session, args = (app_path, data_scaled, session, moves, intensity, timeout, latencies, errors)) for session in range(sessions)]
+
+    # the memory is sampled during the sessions, so that its growth can be attributed to this configuration
+    # (the peak memory of the process would include all the configurations that ran before)
+    memory_baseline = sq_memory()
+
+    memory_samples = []
+
+    sampling = threading.Event()
+
+    def sample_memory():
+
+        while not sampling.wait(0.05):
+
+            memory_samples.append(sq_memory())
+
+    sampler = threading.Thread(target = sample_memory)
+
+    start = time.perf_counter()
+
+    sampler.start()
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    duration = time.perf_counter() - start
+
+    # the errors are only counted in the results, therefore their messages are printed here
+    for error in sorted(set(errors)):
+        print(f"Error in {errors.count(error)} session(s): {error}")
+
+    sampling.set()
+
+    sampler.join()
+
+    memory_samples.append(sq_memory())
+
+    if memory_baseline is None:
+
+        memory_growth = None
+
+    else:
+
+        memory_growth = max(memory_samples) - memory_baseline
+
+    results = {"sessions" : sessions,
+               "scale" : scale,
+               "file (MB)" : len(data_scaled) / 1024 / 1024,
+               "reruns" : len(latencies),
+               "errors" : len(errors)
+              }
+
+    # the reruns before the upload are cheap and the upload reruns process the whole file, therefore the percentiles
+    # are reported separately for the upload and for the slider reruns, instead of pooling all the reruns
+    for step in ["upload", "slider"]:
+
+        step_latencies = [step_duration for step_name, step_duration in latencies if step_name == step]
+
+        # without any successful rerun, the percentiles are not defined
+        if len(step_latencies) > 0:
+
+            percentiles = np.percentile(step_latencies, [50, 90, 99, 100])
+
+        else:
+
+            percentiles = np.full(4, np.nan)
+
+        results[f"{step} p50 (s)"] = percentiles[0]
+        results[f"{step} p90 (s)"] = percentiles[1]
+        results[f"{step} p99 (s)"] = percentiles[2]
+        results[f"{step} max (s)"] = percentiles[3]
+
+    results["reruns/s"] = len(latencies) / duration
+    results["memory (MB)"] = memory_baseline
+    results["memory growth (MB)"] = memory_growth
+
+    return results
+
+
+if __name__ == "__main__":
+
+    folder = Path(__file__).resolve().parent
+
+    parser = argparse.ArgumentParser(description = "Load test of the Streamlit app with concurrent user sessions.")
+    parser.add_argument("--app", default = str(folder / "sq_streamlit.py"), help = "The path of the Streamlit app (default: sq_streamlit.py).")
+    parser.add_argument("--file", default = str(folder / "PROTEIN.tsv"), help = "The PROTEIN.tsv file that the sessions upload (default: PROTEIN.tsv).")
+    parser.add_argument("--sessions", default = "1,2,4,8", help = "Comma-separated numbers of concurrent sessions (default: 1,2,4,8).")
+    parser.add_argument("--scale", default = "1,10", help = "Comma-separated numbers of times the protein rows are repeated (default: 1,10).")
+    parser.add_argument("--moves", type = int, default = 4, help = "The number of times each session moves the sliders (default: 4).")
+    parser.add_argument("--intensity", action = "store_true", help = "Switch on the replicate intensity heatmap in each session.")
+    parser.add_argument("--timeout", type = float, default = 120, help = "The time in seconds after which a rerun is aborted (default: 120).")
+    parser.add_argument("--output", help = "Optional path of a tsv file for the results.")
+    args = parser.parse_args()
+
+    data = Path(args.file).read_bytes()
+
+    app_path = str(Path(args.app).resolve())
+
+    output = Path(args.output).resolve() if args.output else None
+
+    # the app writes its tsv and html files into the working directory, therefore the load test runs in a temporary one
+    os.chdir(tempfile.mkdtemp(prefix = "sq_loadtest_"))
+
+    results = []
+
+    for scale in [int(value) for value in args.scale.split(",")]:
+
+        for sessions in [int(value) for value in args.sessions.split(",")]:
+
+            print(f"Running {sessions} sessions with the protein rows repeated {scale} times.")
+
+            results.append(sq_loadtest(app_path, data, sessions, scale, args.moves, args.intensity, args.timeout))
+
+    results_df = pd.DataFrame(results)
+
+    print(results_df.round(3).to_string(index = False))
+
+    if output is not None:
+
+        results_df.to_csv(output, sep = '\t', index = False)
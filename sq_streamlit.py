@@ -4,14 +4,19 @@ import plotly.express as px
 import re
 import math
 
+# the processing and plotting functions that do not depend on Streamlit (they are also used by sq_api.py)
+from sq_functions import sq_processing, sq_preflight, sq_summary, sq_intensity, sq_figure
+
 ###############
 # defining a function
 
-def sq_processing(sq_df):
+def sq_processing_manual(sq_df):
 
     """
     This function processes the PROTEIN.tsv file that SafeQuant serves as output and returns a dictionary whose values are Pandas dataframes.
-
+    This is a copy of function sq_processing(), but also returns the Pandas dataframes as tsv files.
+    The tsv files are meant to be used with Excel for manual visualization.
+    
     Parameters
     ----------
     Safequant output (PROTEIN.tsv)
@@ -21,6 +26,8 @@ def sq_processing(sq_df):
     -------
     dictionary : dict
         The collection of Pandas dataframes.
+    tsv files: tsv
+        Each Pandas dataframe is exported as a tsv file.
     """
 
     df = sq_df.copy()
@@ -119,312 +126,181 @@ def sq_processing(sq_df):
         # export the dataframes as tsv files
         # renaming the -log10(qValue) column before exporting for compatibility with Excel
     
-        #df_interim.rename(columns = {f"-log10(qValue_{arm})" : f"'-log10(qValue_{arm})"}, inplace = True)
+        df_interim.rename(columns = {f"-log10(qValue_{arm})" : f"'-log10(qValue_{arm})"}, inplace = True)
     
-        #df_interim.to_csv(f'{ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', sep = '\t', index=False)
+        df_interim.to_csv(f'{ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', sep = '\t', index=False)
+           
+        with open(f'{ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', mode = 'rb') as f:
+            st.download_button(label=f'Download {ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', data = f, file_name = f'{ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', mime= 'application/octet-stream')
+        
         
         ################
         
     # this dictionary contains the final tables for each ligand/treatment arm 
-    return df_collection  
+    return df_collection    
+    
     
-
 ###############
 # defining a function
 
-def sq_processing_manual(sq_df):
+def sq_plot_summary(summary):
 
     """
-    This function processes the PROTEIN.tsv file that SafeQuant serves as output and returns a dictionary whose values are Pandas dataframes.
-    This is a copy of function sq_processing(), but also returns the Pandas dataframes as tsv files.
-    The tsv files are meant to be used with Excel for manual visualization.
-    
+    This function visualizes the output of sq_summary() as a heatmap of the significant hits (proteins x arms).
+
     Parameters
     ----------
-    Safequant output (PROTEIN.tsv)
-        The tsv file that SafeQuant returns with the protein data.
+    summary : dict
+        The output of sq_summary().
     
     Returns
     -------
-    dictionary : dict
-        The collection of Pandas dataframes.
-    tsv files: tsv
-        Each Pandas dataframe is exported as a tsv file.
+    Plotly Plot
+        The plot created by Plotly.
     """
 
-    df = sq_df.copy()
-    
-    # creating the list of column names
-    # creating the list of column names to keep
-    # creating the list of column names to drop
-    
-    # the * operator unpacks the .columns set, the list() method would also work 
-    column_names = [*df.columns]
-    
-    # Match objects always have a boolean value of True. re.search() returns Match objects if it finds a match
-    columns_to_keep = [name for name in column_names if re.search( r"(proteinName)|(^ac)|(geneName)|(proteinDescription)|(nbPeptides)|(^pValue)|(^qValue)|(^log2ratio)", name)]
-    
-    # the columns_to_drop list gets processed and complete with the for loop below
-    columns_to_drop = column_names.copy()
-    
-    for column in columns_to_keep:
-    
-        columns_to_drop.remove(column)
+    hits = summary["hits"]
 
-    # dropping the unnecessary columns
+    if hits.empty:
 
-    df.drop(labels = columns_to_drop, axis = 1, inplace = True)
+        st.write("No protein passes the enrichment and statistical thresholds.")
 
-    # renaming columns
+        return
 
-    df.rename(columns = {"proteinName" : "Protein Name",
-                              "ac" : "Accession",
-                              "geneName" : "Gene Name",
-                              "proteinDescription" : "Protein Description"
-                             }, inplace = True)
+    treatment_arms = [*hits.columns[1:]]
 
-    # shortening the info in the "Protein Description" column
+    # up hits are depicted in red and down hits in blue, the rest stays white
+    fig = px.imshow(hits[treatment_arms].to_numpy(),
+                    x = treatment_arms,
+                    y = hits["Protein Name"],
+                    zmin = -1,
+                    zmax = 1,
+                    color_continuous_scale = [[0, "blue"], [0.5, "white"], [1, "red"]],
+                    labels = {"x" : "Treatment arm", "y" : "Protein Name", "color" : "Hit"},
+                    aspect = "auto"
+                   )
 
-    df["Protein Description"] = df["Protein Description"].apply(lambda x: re.sub(r"\sOS=.+$", "", x))
-    
-    # removing additional accessions from the "Protein Name" column
-    
-    df["Protein Name"] = df["Protein Name"].apply(lambda x: re.sub(r";.+$", "", x))
-    
-    # creating a new column with a shortened "Protein Name" and making it the second column of the data frame
-    # ATTENTION: this will disguise ligands coming from another species!!!
-    
-    df["Protein Name (short)"] = df["Protein Name"].apply(lambda x: re.sub(r"(^sp\|.+\|)|(_.+$)", "", x))
-    
-    column_to_move = df.pop("Protein Name (short)")
-    
-    df.insert(1, "Protein Name (short)", column_to_move)
+    # the height grows with the number of proteins, so that the protein names stay readable
+    fig.update_layout(height = min(max(400, 15 * len(hits)), 4000))
 
-    # selecting the columns that will be logarithmized
+    fig.update_coloraxes(colorbar = {"tickvals" : [-1, 0, 1], "ticktext" : ["down", "none", "up"]})
 
-    # Match objects always have a boolean value of True. re.search() returns Match objects if it finds a match
-    columns_for_log = [name for name in columns_to_keep if re.search( r"(^qValue)", name)]
-    
-    # logarithmizing the qValues
-    for name in columns_for_log:
-        
-        df[f"-log10({name})"] = df[f"{name}"].apply(lambda x: abs(math.log10(x)))
+    # setting title properties
+    fig.update_layout(title_text = f"Significant hits vs {ligand_on_the_left} ({project_info}, {number_of_peptides})")
+    fig.update_layout(title = {'x' : 0.5, 'y' : 0.98,'xanchor' : 'center', 'yanchor' : 'top'})
 
-    # selecting columns whose names end with all possible ligands, e.g. the log2 columns
-    # the columns_for_log list from above can also be used instead
+    #fig.show()
+    fig.write_html(f"{project_info}_{number_of_peptides}_{ligand_on_the_left}_summary.html", auto_open=False)
+    st.plotly_chart(fig, theme = None)
 
-    columns_ligand = [name for name in df.columns if re.search(r"^log2", name)]
+    with open(f"{project_info}_{number_of_peptides}_{ligand_on_the_left}_summary.html", mode = 'rb') as f:
+        st.download_button(label=f"Download {project_info}_{number_of_peptides}_{ligand_on_the_left}_summary.html", data = f, file_name = f"{project_info}_{number_of_peptides}_{ligand_on_the_left}_summary.html", mime= 'application/octet-stream')
 
-    # finding out what are the names of the treatment arms
-    # IMPORTANT: the name of the treatment arm must not contain "_" and always be in the format e.g. log2ratio_NAME
-    
-    treatment_arms =[]
-    
-    for name in columns_ligand:
-    
-        # this returns the match object for each treatment arm
-        match = re.search(r"_.+$", name)
-    
-        # this returns the matching string for each treatment arm after stripping the "_"
-        treatment_arms.append(match.group().lstrip("_"))
 
-    # these columns need always be present
-    columns_obligatory = [*df.iloc[:, 0:6].columns]
-    
-    # this placeholder dictionary will store each ligand's dataframe
-    df_collection = {}
-    
-    for arm in treatment_arms:
-    
-        # create a dataframe for each treatment arm with the columns to be kept in each iteration, i.e. obligatory columns, plus ligand-specific columns
-        # Match objects always have a boolean value of True. re.search() returns Match objects if it finds a match
-        columns_to_include = [name for name in df.columns if name in columns_obligatory or re.search(fr"_{arm}\)?$", name)]
-        
-        df_interim = df.loc[:, columns_to_include].copy()
-        
-        df_collection[f"{arm}"] = df_interim.copy()
-    
-        ################
-        # export the dataframes as tsv files
-        # renaming the -log10(qValue) column before exporting for compatibility with Excel
-    
-        df_interim.rename(columns = {f"-log10(qValue_{arm})" : f"'-log10(qValue_{arm})"}, inplace = True)
-    
-        df_interim.to_csv(f'{ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', sep = '\t', index=False)
-           
-        with open(f'{ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', mode = 'rb') as f:
-            st.download_button(label=f'Download {ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', data = f, file_name = f'{ligand_on_the_left}_vs_{arm}_{number_of_peptides}.tsv', mime= 'application/octet-stream')
-        
-        
-        ################
-        
-    # this dictionary contains the final tables for each ligand/treatment arm 
-    return df_collection    
-    
-    
 ###############
 # defining a function
 
-def sq_plot(dictionary, enrichment_threshold, statistical_threshold):
-    
+def sq_plot_intensity(intensity):
+
     """
-    This function visualizes the elements of a dictionary whose values are Pandas dataframes containing data from SafeQuant.
+    This function visualizes the output of sq_intensity() as a heatmap of the z-scored replicate intensities (proteins x replicates).
 
     Parameters
     ----------
-    dictionary : dict
-        The collection of Pandas dataframes.
+    intensity : dict
+        The output of sq_intensity().
     
     Returns
     -------
-    Plotly Plots
-        The plots created by Plotly.
+    Plotly Plot
+        The plot created by Plotly.
     """
-   
-    # reminder: for loops with dictionaries in python loop through the keys
-    # the key needs to be used as dictionary[key] in the for loop in order to get the value
-    
-    for key in dictionary:
-        
-        ################################################## 
-        # determine the range of the x axis based on log2 column
-        
-        log2max = dictionary[key].iloc[:, 6].max()
 
-        log2min = abs(dictionary[key].iloc[:, 6].min())
-        
+    zscore_df = intensity["zscore"]
 
-        if log2max > log2min:
+    if zscore_df.empty:
 
-            log2range = math.ceil(log2max + 1)
+        st.write("There are no replicate intensities to show: either no protein passes the enrichment and statistical thresholds, or the file has no replicate intensity columns.")
 
-            if log2range % 2 == 0:
-                
-                pass
-          
-            else:
+        return
 
-                log2range = log2range + 1
+    fig = px.imshow(zscore_df.to_numpy(),
+                    x = [*zscore_df.columns],
+                    y = [*zscore_df.index],
+                    zmin = -3,
+                    zmax = 3,
+                    color_continuous_scale = "RdBu_r",
+                    labels = {"x" : "Replicate", "y" : "Protein Name", "color" : "z-score"},
+                    aspect = "auto"
+                   )
 
-        elif log2max < log2min:
+    # the height grows with the number of proteins, so that the protein names stay readable
+    fig.update_layout(height = min(max(400, 15 * len(zscore_df)), 4000))
 
-            log2range = math.ceil(log2min + 1)
+    # setting title properties
+    fig.update_layout(title_text = f"Replicate intensities of the significant hits ({project_info}, {number_of_peptides})")
+    fig.update_layout(title = {'x' : 0.5, 'y' : 0.98,'xanchor' : 'center', 'yanchor' : 'top'})
+    fig.update_xaxes(tickangle = 45)
 
-            if log2range % 2 == 0:
+    #fig.show()
+    fig.write_html(f"{project_info}_{number_of_peptides}_{ligand_on_the_left}_intensities.html", auto_open=False)
+    st.plotly_chart(fig, theme = None)
 
-                pass
-          
-            else:
+    with open(f"{project_info}_{number_of_peptides}_{ligand_on_the_left}_intensities.html", mode = 'rb') as f:
+        st.download_button(label=f"Download {project_info}_{number_of_peptides}_{ligand_on_the_left}_intensities.html", data = f, file_name = f"{project_info}_{number_of_peptides}_{ligand_on_the_left}_intensities.html", mime= 'application/octet-stream')
 
-                log2range = log2range + 1
-                
-        # this is for the rare case were log2max and log2min might be equal
-        
-        else:
 
-            log2range = math.ceil(log2min + 1)
-
-            if log2range % 2 == 0:
+###############
+# defining a function
 
-                pass
-          
-            else:
+def sq_plot(dictionary, enrichment_threshold, statistical_threshold, summary = None):
+    
+    """
+    This function visualizes the elements of a dictionary whose values are Pandas dataframes containing data from SafeQuant.
 
-                log2range = log2range + 1
+    Parameters
+    ----------
+    dictionary : dict
+        The collection of Pandas dataframes.
+    enrichment_threshold : float
+        The enrichment threshold (log2 space).
+    statistical_threshold : float
+        The statistical threshold (-log10 space).
+    summary : dict, optional
+        The output of sq_summary(). It is computed from the dictionary if not provided.
+    
+    Returns
+    -------
+    Plotly Plots
+        The plots created by Plotly.
+    """
+   
+    # the summary of all treatment arms is only computed here if it was not passed by the caller
+    if summary is None:
+        summary = sq_summary(dictionary, enrichment_threshold, statistical_threshold)
 
+    # reminder: for loops with dictionaries in python loop through the keys
+    # the key needs to be used as dictionary[key] in the for loop in order to get the value
+    
+    for key in dictionary:
+        
         ##################################################
-        # determine the range of the y axis based on the -log10 column
+        # the ranges of the x and y axes of all treatment arms are computed at once by sq_summary()
         
-        log10max = dictionary[key].iloc[:, 9].max()
+        log2range = int(summary["overview"].loc[key, "log2 range"])
 
-        log10range = math.ceil(log10max + 2)
+        log10range = int(summary["overview"].loc[key, "-log10 range"])
 
         ##################################################
         # using plotly to draw the volcano plot for each pairwise comparison
         
-        fig = px.scatter(dictionary[key],
-                         x = dictionary[key].iloc[: , 6],
-                         y = dictionary[key].iloc[: , 9], 
-                         hover_name = dictionary[key].iloc[: , 0],
-                         hover_data = [dictionary[key].iloc[: , 5], dictionary[key].iloc[: , 6], dictionary[key].iloc[: , 9]],
-                         labels = {dictionary[key].iloc[: , 6].name : "log\u2082(fold change)", dictionary[key].iloc[: , 9].name : "-log\u2081\u2080(adjusted p-value)"}
-                         #text = dictionary[key].iloc[: , 1]
-                        )
-                 
-        fig.update_traces(textposition='top center')
-
-        fig.update_traces(marker={"size" : 6,
-                                  "line": {"width" : 1, "color" : "black"},
-                                  "color" : "teal"
-                                 }
-                         )
-
-        # setting background properties
-        fig.update_layout(plot_bgcolor = "white")
-
-        # setting title properties
-        fig.update_layout(title_text = f"{ligand_on_the_left} vs {key} ({project_info}, {number_of_peptides})")
-        fig.update_layout(title = {'x' : 0.5, 'y' : 0.96,'xanchor' : 'center', 'yanchor' : 'top'})        
-        fig.update_xaxes(title_font = {"size": 16},  title_standoff = 10)
-        fig.update_yaxes(title_font = {"size": 16},  title_standoff = 10)
-        
-        # setting axes range and tick properties
-        fig.update_xaxes(range = [-log2range, log2range], fixedrange = False, dtick = 2, ticklabelstandoff = 7)
-        fig.update_yaxes(range = [0, log10range], fixedrange = False, dtick = 1, ticklabelstandoff = 7)
-        fig.update_yaxes(ticklabelstep=1)
-
-        # setting axes line properties
-        fig.update_xaxes(showline=True, linewidth=1, linecolor='black', mirror = True)
-        fig.update_yaxes(showline=True, linewidth=1, linecolor='black', mirror = True)
-        
-        # setting zero line properties
-        fig.update_xaxes(zeroline=True, zerolinewidth=2, zerolinecolor='black')
-        fig.update_yaxes(zeroline=False, zerolinewidth=3, zerolinecolor='black')
-
-        # setting grid properties (Plotly accepts hex colours as strings)
-        fig.update_yaxes(showgrid = True, gridcolor = '#bbbbbf', gridwidth = 1)
-        fig.update_xaxes(showgrid = True, gridcolor = '#bbbbbf', gridwidth = 1)
-
-        # adding background shapes
-        fig.add_shape(type = "rect",
-                      x0 = enrichment_threshold, 
-                      y0 = 0, 
-                      x1 = log2range, 
-                      y1 = statistical_threshold,
-                      line = {"color" : "blue", "width" : 0},
-                      fillcolor = "blue",
-                      opacity = 0.1
-                     )
-        
-        fig.add_shape(type="rect",
-                      x0 = 0, 
-                      y0 = 0, 
-                      x1 = enrichment_threshold, 
-                      y1 = log10range,
-                      line = {"color" : "blue", "width" : 0},
-                      fillcolor = "blue",
-                      opacity=0.1
-                     )
-        
-        fig.add_shape(type="rect",
-                      x0 = -enrichment_threshold, 
-                      y0 = 0, 
-                      x1 = -log2range, 
-                      y1 = statistical_threshold,
-                      line = {"color" : "blue", "width" : 0},
-                      fillcolor="blue",
-                      opacity=0.1
-                     )
-        
-        fig.add_shape(type="rect",
-                      x0 = 0, 
-                      y0 = 0, 
-                      x1 = -enrichment_threshold, 
-                      y1 = log10range,
-                      line = {"color" : "blue", "width" : 0},
-                      fillcolor="blue",
-                      opacity=0.1
-                     )
+        fig = sq_figure(dictionary[key],
+                        f"{ligand_on_the_left} vs {key} ({project_info}, {number_of_peptides})",
+                        enrichment_threshold,
+                        statistical_threshold,
+                        log2range,
+                        log10range,
+                        text = False)
                
         #fig.show()
         fig.write_html(f"{project_info}_{number_of_peptides}_{ligand_on_the_left}_vs_{key}.html", auto_open=False)
@@ -436,7 +312,7 @@ def sq_plot(dictionary, enrichment_threshold, statistical_threshold):
 ###############
 # defining a function
 
-def sq_plot_text(dictionary, enrichment_threshold, statistical_threshold):
+def sq_plot_text(dictionary, enrichment_threshold, statistical_threshold, summary = None):
     
     """
     This function visualizes the elements of a dictionary whose values are Pandas dataframes containing data from SafeQuant.
@@ -446,6 +322,12 @@ def sq_plot_text(dictionary, enrichment_threshold, statistical_threshold):
     ----------
     dictionary : dict
         The collection of Pandas dataframes.
+    enrichment_threshold : float
+        The enrichment threshold (log2 space).
+    statistical_threshold : float
+        The statistical threshold (-log10 space).
+    summary : dict, optional
+        The output of sq_summary(). It is computed from the dictionary if not provided.
     
     Returns
     -------
@@ -453,150 +335,32 @@ def sq_plot_text(dictionary, enrichment_threshold, statistical_threshold):
         The plots created by Plotly.
     """
    
+    # the summary of all treatment arms is only computed here if it was not passed by the caller
+    if summary is None:
+        summary = sq_summary(dictionary, enrichment_threshold, statistical_threshold)
+
     # reminder: for loops with dictionaries in python loop through the keys
     # the key needs to be used as dictionary[key] in the for loop in order to get the value
     
     for key in dictionary:
         
-        ################################################## 
-        # determine the range of the x axis based on log2 column
-        
-        log2max = dictionary[key].iloc[:, 6].max()
-
-        log2min = abs(dictionary[key].iloc[:, 6].min())
-        
-
-        if log2max > log2min:
-
-            log2range = math.ceil(log2max + 1)
-
-            if log2range % 2 == 0:
-                
-                pass
-          
-            else:
-
-                log2range = log2range + 1
-
-        elif log2max < log2min:
-
-            log2range = math.ceil(log2min + 1)
-
-            if log2range % 2 == 0:
-
-                pass
-          
-            else:
-
-                log2range = log2range + 1
-                
-        # this is for the rare case were log2max and log2min might be equal
-        
-        else:
-
-            log2range = math.ceil(log2min + 1)
-
-            if log2range % 2 == 0:
-
-                pass
-          
-            else:
-
-                log2range = log2range + 1
-
         ##################################################
-        # determine the range of the y axis based on the -log10 column
+        # the ranges of the x and y axes of all treatment arms are computed at once by sq_summary()
         
-        log10max = dictionary[key].iloc[:, 9].max()
+        log2range = int(summary["overview"].loc[key, "log2 range"])
 
-        log10range = math.ceil(log10max + 2)
+        log10range = int(summary["overview"].loc[key, "-log10 range"])
 
         ##################################################
         # using plotly to draw the volcano plot for each pairwise comparison
         
-        fig = px.scatter(dictionary[key],
-                         x = dictionary[key].iloc[: , 6],
-                         y = dictionary[key].iloc[: , 9], 
-                         hover_name = dictionary[key].iloc[: , 0],
-                         hover_data = [dictionary[key].iloc[: , 5], dictionary[key].iloc[: , 6], dictionary[key].iloc[: , 9]],
-                         labels = {dictionary[key].iloc[: , 6].name : "log\u2082(fold change)", dictionary[key].iloc[: , 9].name : "-log\u2081\u2080(adjusted p-value)"},
-                         text = dictionary[key].iloc[: , 1]
-                        )
-                 
-        fig.update_traces(textposition='top center')
-
-        fig.update_traces(marker={"size" : 6,
-                                  "line": {"width" : 1, "color" : "black"},
-                                  "color" : "teal"
-                                 }
-                         )
-
-        # setting background properties
-        fig.update_layout(plot_bgcolor = "white")
-
-        # setting title properties
-        fig.update_layout(title_text = f"{ligand_on_the_left} vs {key} ({project_info}, {number_of_peptides})")
-        fig.update_layout(title = {'x' : 0.5, 'y' : 0.96,'xanchor' : 'center', 'yanchor' : 'top'})        
-        fig.update_xaxes(title_font = {"size": 16},  title_standoff = 10)
-        fig.update_yaxes(title_font = {"size": 16},  title_standoff = 10)
-        
-        # setting axes range and tick properties
-        fig.update_xaxes(range = [-log2range, log2range], fixedrange = False, dtick = 2, ticklabelstandoff = 7)
-        fig.update_yaxes(range = [0, log10range], fixedrange = False, dtick = 1, ticklabelstandoff = 7)
-        fig.update_yaxes(ticklabelstep=1)
-
-        # setting axes line properties
-        fig.update_xaxes(showline=True, linewidth=1, linecolor='black', mirror = True)
-        fig.update_yaxes(showline=True, linewidth=1, linecolor='black', mirror = True)
-        
-        # setting zero line properties
-        fig.update_xaxes(zeroline=True, zerolinewidth=2, zerolinecolor='black')
-        fig.update_yaxes(zeroline=False, zerolinewidth=3, zerolinecolor='black')
-
-        # setting grid properties (Plotly accepts hex colours as strings)
-        fig.update_yaxes(showgrid = True, gridcolor = '#bbbbbf', gridwidth = 1)
-        fig.update_xaxes(showgrid = True, gridcolor = '#bbbbbf', gridwidth = 1)
-
-        # adding background shapes
-        fig.add_shape(type = "rect",
-                      x0 = enrichment_threshold, 
-                      y0 = 0, 
-                      x1 = log2range, 
-                      y1 = statistical_threshold,
-                      line = {"color" : "blue", "width" : 0},
-                      fillcolor = "blue",
-                      opacity = 0.1
-                     )
-        
-        fig.add_shape(type="rect",
-                      x0 = 0, 
-                      y0 = 0, 
-                      x1 = enrichment_threshold, 
-                      y1 = log10range,
-                      line = {"color" : "blue", "width" : 0},
-                      fillcolor = "blue",
-                      opacity=0.1
-                     )
-        
-        fig.add_shape(type="rect",
-                      x0 = -enrichment_threshold, 
-                      y0 = 0, 
-                      x1 = -log2range, 
-                      y1 = statistical_threshold,
-                      line = {"color" : "blue", "width" : 0},
-                      fillcolor="blue",
-                      opacity=0.1
-                     )
-        
-        fig.add_shape(type="rect",
-                      x0 = 0, 
-                      y0 = 0, 
-                      x1 = -enrichment_threshold, 
-                      y1 = log10range,
-                      line = {"color" : "blue", "width" : 0},
-                      fillcolor="blue",
-                      opacity=0.1
-                     )
+        fig = sq_figure(dictionary[key],
+                        f"{ligand_on_the_left} vs {key} ({project_info}, {number_of_peptides})",
+                        enrichment_threshold,
+                        statistical_threshold,
+                        log2range,
+                        log10range,
+                        text = True)
                
         #fig.show()
         fig.write_html(f"{project_info}_{number_of_peptides}_{ligand_on_the_left}_vs_{key}_withText.html", auto_open=False)
@@ -618,9 +382,13 @@ After uploading a PROTEIN.tsv file:
 
 a. the results will be processed and you can download a tsv file for each pairwise comparison.
 
-b. an interactive volcano plot (without text annotations) will be created, which can be downloaded.
+b. a summary of all pairwise comparisons (axis ranges, hit counts, top hits and a heatmap of the hits) will be created.
+
+   Optionally, a heatmap of the replicate intensities of the hits can be shown.
 
-c. an interactive volcano plot (with text annotations) will be created, which can be downloaded.""")
+c. an interactive volcano plot (without text annotations) will be created, which can be downloaded.
+
+d. an interactive volcano plot (with text annotations) will be created, which can be downloaded.""")
 
 st.write("--------------------------------------------------")
 
@@ -668,8 +436,29 @@ file = st.file_uploader(
     type = "tsv",
     key = st.session_state["file_uploader_key"])
 
+# checking the header line and a few sample rows before the whole file is parsed
+
 if file is not None:
 
+    # the check only runs once per uploaded file and not on every rerun of the app (e.g. when a slider is moved)
+    if st.session_state.get("preflight_file_id") != file.file_id:
+        st.session_state["preflight"] = sq_preflight(file)
+        st.session_state["preflight_file_id"] = file.file_id
+
+    preflight = st.session_state["preflight"]
+
+    if preflight["arms"]:
+        st.write(f"The treatment arms are: **{', '.join(preflight['arms'])}**.")
+
+    # the estimates are only complete (and the processing time only projected) if no problems were found
+    if not preflight["problems"]:
+        st.write(f"Estimated number of proteins: **{preflight['rows']}**, estimated memory: **{preflight['memory'] / 1e6:.1f} MB**, projected time to parse and process the file (without the plots): **{preflight['seconds']:.2f} s**.")
+
+    for problem in preflight["problems"]:
+        st.error(problem)
+
+if file is not None and not preflight["problems"]:
+
     dual = pd.read_csv(file, sep = '\t')
 
     dual_df = dual.copy()
@@ -720,13 +509,60 @@ if file is not None:
     
     st.write("--------------------------------------------------")
     
+    # summary of all treatment arms: axis ranges, hit counts and top hits are computed in one pass
+    
+    
+    st.write("#### You can review a summary of all pairwise comparisons.")
+    
+    
+    summary = sq_summary(dict_for_viz, enrichment_thr, statistical_thr)
+    
+    st.dataframe(summary["overview"])
+    
+    st.dataframe(summary["top"], hide_index = True)
+    
+    sq_plot_summary(summary)
+    
+    
+    st.write("--------------------------------------------------")
+    
+    # optional view: replicate intensities of the proteins that pass the thresholds
+    
+    
+    st.write("#### You can review the replicate intensities of the significant hits.")
+    
+    
+    show_intensity = st.checkbox(
+        label = "Show the replicate intensity heatmap of the significant hits.",
+        value = False,
+        key = "show_intensity_key")
+    
+    if show_intensity:
+    
+        max_proteins = st.slider(
+            label = "Set the maximum number of proteins in the heatmap:",
+            min_value = 10,
+            max_value = 1000,
+            value = 200,
+            step = 10)
+    
+        # the uploaded file is already in memory, therefore it does not need to be read again
+        intensity = sq_intensity(dual_df, summary, max_proteins)
+        
+        sq_plot_intensity(intensity)
+        
+        st.dataframe(intensity["stats"], hide_index = True)
+    
+    
+    st.write("--------------------------------------------------")
+    
     # visualization alternative 1: plotly plots without text annotations
     
     
     st.write("#### You can download the volcano plots without annotations.")
     
     
-    sq_plot(dict_for_viz, enrichment_thr, statistical_thr)
+    sq_plot(dict_for_viz, enrichment_thr, statistical_thr, summary)
     
     
     st.write("--------------------------------------------------")
@@ -738,12 +574,15 @@ if file is not None:
     st.write("#### You can download the volcano plots with annotations.")
     
     
-    sq_plot_text(dict_for_viz, enrichment_thr, statistical_thr)
+    sq_plot_text(dict_for_viz, enrichment_thr, statistical_thr, summary)
     
     
     st.write("--------------------------------------------------")
     st.write("--------------------------------------------------")
     
+elif file is not None:
+    st.write("### Please upload a valid PROTEIN.tsv file from SafeQuant.")
+
 else:
     st.write("### Please upload a file to use the app.")
 